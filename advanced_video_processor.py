@@ -1,23 +1,41 @@
 #!/usr/bin/env python3
 """Convert TS → MOV with synchronized metadata overlay for BMW Drive Recorder."""
 
+import glob
 import json
+import re
+import select
+import shutil
 import subprocess
 import os
 import sys
 import tempfile
 from datetime import datetime
 
+import numpy as np
+
+try:
+    import orjson  # optional: much faster JSON parsing than stdlib json
+except ImportError:
+    orjson = None
+
+def _json_loads(buf):
+    """Parse a JSON document with orjson when available."""
+    if orjson is not None:
+        return orjson.loads(buf)
+    return json.loads(buf)
+
 # ——— CONFIGURATION ———
 
-# Input TS file (BMW recorder video)
+# Input TS file (BMW recorder video); may be a glob such as
+# "*_Drive_Recorder_*.ts" — multiple segments are joined in one ffmpeg run
 TS_FILE = "01_Drive_Recorder_Camera_selection_All.ts"       # BMW recorder video file
 
 # Metadata JSON file with GPS, speed, date/time data
 JSON_FILE = "Metadata.json"                                # Metadata file
 
-# Which quadrant to crop (0 = full; 1–4 = quadrants)
-CROP_QUADRANT = 1                                          # 0: no crop; 1: top-left; 2: top-right; 3: bottom-left; 4: bottom-right
+# Which quadrant to crop (0 = full; 1–4 = quadrants; 'all' = every quadrant)
+CROP_QUADRANT = 1                                          # 0: no crop; 1: top-left; 2: top-right; 3: bottom-left; 4: bottom-right; 'all': one file per quadrant
 
 # Display flags for overlay components
 DISPLAY = {
@@ -27,6 +45,17 @@ DISPLAY = {
     'coordinates': False,  # Show GPS coordinates
 }
 
+# Overlay delivery: True burns the overlay into the video frames (ass
+# filter, re-renders every frame); False muxes it as a soft mov_text
+# subtitle track the player toggles, which skips the per-frame burn
+BURN_SUBTITLES = True
+
+# libx264 encoding settings (CPU fallback when NVENC is unavailable).
+# CRF 18 at the default preset is visually transparent for the recorder's
+# already-lossy source; set "veryslow" / "1" for archival-grade output.
+PRESET = "medium"                  # libx264 encoding preset
+CRF    = "18"                      # libx264 constant rate factor
+
 # Video trimming configuration
 ENABLE_TRIMMING = False             # Enable trimming of input video
 TRIM_START    = "00:00:00"         # Trim start time (HH:MM:SS or seconds)
@@ -67,21 +96,102 @@ ASS_STYLE = {
     'Encoding':       1,               # Text encoding (1 = default)
 }
 
+# Field order mandated by the [V4+ Styles] Format line
+_STYLE_FIELDS = (
+    'Fontname', 'Fontsize', 'PrimaryColour', 'SecondaryColour', 'OutlineColour',
+    'BackColour', 'Bold', 'Italic', 'Underline', 'StrikeOut', 'ScaleX', 'ScaleY',
+    'Spacing', 'Angle', 'BorderStyle', 'Outline', 'Shadow', 'Alignment', 'MarginL',
+    'MarginR', 'MarginV', 'Encoding'
+)
+
+def _style_line(name: str, fontsize: int, margin_v: int) -> str:
+    """Render one 'Style:' line from ASS_STYLE with per-style overrides."""
+    values = dict(ASS_STYLE, Fontsize=fontsize, MarginV=margin_v)
+    return f"Style: {name}," + ",".join(str(values[key]) for key in _STYLE_FIELDS)
+
+# Both style lines are fixed at import time, so build them once instead of
+# mutating ASS_STYLE and re-joining the fields on every overlay generation
+SPEED_STYLE = _style_line("Speed", int(FONT_SIZE * SPEED_MULTIPLIER), 30)
+INFO_STYLE  = _style_line("Info", FONT_SIZE, 60)
+
 # ——— Helpers ———
 
+# Crop expressions for each quadrant (1: top-left … 4: bottom-right)
+QUADRANT_CROPS = {
+    1: "crop=in_w/2:in_h/2:0:0",
+    2: "crop=in_w/2:in_h/2:in_w/2:0",
+    3: "crop=in_w/2:in_h/2:0:in_h/2",
+    4: "crop=in_w/2:in_h/2:in_w/2:in_h/2",
+}
+
+# Cached result of the NVENC probe (None = not probed yet)
+_NVENC_AVAILABLE = None
+
+# Matches the 'time=HH:MM:SS.cc' field in ffmpeg's stderr progress output
+_PROGRESS_RE = re.compile(rb'time=(\S+)')
+
+# One template for every Dialogue line: (start, end, style, text)
+_DIALOGUE_TMPL = "Dialogue: 0,%s,%s,%s,,0,0,0,,%s"
+
+# Subtitle files are small and read exactly once by ffmpeg; keep them on
+# tmpfs where the platform provides it (Linux) so they never hit the disk.
+# None falls back to the regular temp directory (e.g. on macOS).
+_TMPFS_DIR = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+def _resolve_ts_files(ts_path: str) -> list:
+    """Expand a TS path that may be a glob over recorder segments."""
+    matches = sorted(glob.glob(ts_path))
+    return matches if matches else [ts_path]
+
+def _build_input_args(ts_files: list):
+    """
+    Return (ffmpeg input args, concat list path or None).
+    Multiple segments go through the concat demuxer so one ffmpeg process
+    handles the whole recording instead of paying startup and muxer
+    flush costs once per segment.
+    """
+    if len(ts_files) == 1:
+        return ['-i', ts_files[0]], None
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False,
+                                     dir=_TMPFS_DIR) as tmp:
+        tmp.write("".join("file '%s'\n" % os.path.abspath(p)
+                          for p in ts_files))
+    return ['-f', 'concat', '-safe', '0', '-i', tmp.name], tmp.name
+
+def _detect_nvenc() -> bool:
+    """
+    Return True if this ffmpeg build exposes the h264_nvenc hardware encoder.
+    The probe runs `ffmpeg -encoders` once and caches the result.
+    """
+    global _NVENC_AVAILABLE
+    if _NVENC_AVAILABLE is None:
+        try:
+            result = subprocess.run(['ffmpeg', '-hide_banner', '-encoders'],
+                                    capture_output=True, text=True)
+            _NVENC_AVAILABLE = (result.returncode == 0 and
+                                'h264_nvenc' in result.stdout)
+        except (OSError, FileNotFoundError):
+            _NVENC_AVAILABLE = False
+    return _NVENC_AVAILABLE
+
 def format_time(sec: float) -> str:
     """Convert seconds → 'H:MM:SS.CS' for ASS timestamps."""
-    h = int(sec // 3600)
-    m = int((sec % 3600) // 60)
-    s = sec % 60
-    return f"{h}:{m:02d}:{s:05.2f}"
-
-def generate_output_filename() -> str:
+    # Integer divmod chain on centiseconds; cheaper than float modulo plus
+    # f-string float formatting in the subtitle loop
+    cs = int(sec * 100 + 0.5)
+    s, cs = divmod(cs, 100)
+    m, s  = divmod(s, 60)
+    h, m  = divmod(m, 60)
+    return "%d:%02d:%02d.%02d" % (h, m, s, cs)
+
+def generate_output_filename(crop_quadrant=None) -> str:
     """
     Create an output filename reflecting crop quadrant and trim options.
     Example: Drive_Recorder_Enhanced_Q1_trim_000015_000010.mov
     """
-    quadrant = "full" if CROP_QUADRANT == 0 else f"Q{CROP_QUADRANT}"
+    if crop_quadrant is None:
+        crop_quadrant = CROP_QUADRANT
+    quadrant = "full" if crop_quadrant == 0 else f"Q{crop_quadrant}"
     trim = ""
     if ENABLE_TRIMMING:
         # Remove colons and dots for filename cleanliness
@@ -93,13 +203,20 @@ OUTPUT_FILE = generate_output_filename()
 
 def check_dependencies() -> bool:
     """Ensure ffmpeg and ffprobe are installed on the system."""
+    # One `ffmpeg -version` probe (parsed for the version line) plus a PATH
+    # lookup for ffprobe, instead of spawning a process per tool
     missing = []
-    for tool in ('ffmpeg', 'ffprobe'):
-        try:
-            subprocess.run([tool, '-version'], stdout=subprocess.DEVNULL,
-                           stderr=subprocess.DEVNULL, check=True)
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            missing.append(tool)
+    try:
+        result = subprocess.run(['ffmpeg', '-version'],
+                                capture_output=True, text=True)
+    except (OSError, FileNotFoundError):
+        result = None
+    if result is None or result.returncode != 0:
+        missing.append('ffmpeg')
+    elif result.stdout:
+        print(f"🔧 {result.stdout.splitlines()[0]}")
+    if shutil.which('ffprobe') is None:
+        missing.append('ffprobe')
     if missing:
         print(f"❌ Missing required tools: {', '.join(missing)}")
         print("   Install via Homebrew: brew install ffmpeg")
@@ -111,8 +228,8 @@ def load_metadata(filepath: str):
     Parse metadata JSON; return a tuple (entries_list, VIN).
     Supports either a list-of-dicts or single-dict format.
     """
-    with open(filepath, 'r') as f:
-        data = json.load(f)
+    with open(filepath, 'rb') as f:
+        data = _json_loads(f.read())
     if isinstance(data, list) and data:
         entries = data[0].get('entries', [])
         vin     = data[0].get('VIN', 'Unknown')
@@ -121,20 +238,63 @@ def load_metadata(filepath: str):
         vin     = data.get('VIN', 'Unknown')
     return entries, vin
 
+# ffprobe durations keyed by file path, so repeated conversions of the same
+# input don't spawn ffprobe and re-parse its JSON again
+_DURATION_CACHE = {}
+
 def get_video_duration(ts_path: str) -> float:
     """
-    Use ffprobe to obtain video duration (seconds).
-    Raises RuntimeError if ffprobe fails.
+    Use ffprobe to obtain video duration (seconds). Results are cached
+    per path. Raises RuntimeError if ffprobe fails.
     """
+    if ts_path in _DURATION_CACHE:
+        return _DURATION_CACHE[ts_path]
+    # Ask for the one field we need as a bare value instead of dumping and
+    # parsing the whole -show_format JSON document
     cmd = [
-        'ffprobe', '-v', 'quiet', '-print_format', 'json',
-        '-show_format', ts_path
+        'ffprobe', '-v', 'quiet',
+        '-show_entries', 'format=duration',
+        '-of', 'default=noprint_wrappers=1:nokey=1', ts_path
     ]
-    result = subprocess.run(cmd, capture_output=True, text=True)
+    result = subprocess.run(cmd, capture_output=True)
     if result.returncode != 0:
         raise RuntimeError("ffprobe failed to read video duration.")
-    info = json.loads(result.stdout)
-    return float(info['format']['duration'])
+    duration = float(result.stdout.decode().strip())
+    _DURATION_CACHE[ts_path] = duration
+    return duration
+
+# Audio codec name per file path, probed once like the duration cache
+_AUDIO_CODEC_CACHE = {}
+
+def get_audio_codec(ts_path: str) -> str:
+    """
+    Return the codec name of the first audio stream via ffprobe (cached
+    per path). Returns '' when there is no audio or the probe fails.
+    """
+    if ts_path not in _AUDIO_CODEC_CACHE:
+        cmd = [
+            'ffprobe', '-v', 'quiet', '-select_streams', 'a:0',
+            '-show_entries', 'stream=codec_name',
+            '-of', 'default=noprint_wrappers=1:nokey=1', ts_path
+        ]
+        try:
+            result = subprocess.run(cmd, capture_output=True)
+            codec = (result.stdout.decode().strip()
+                     if result.returncode == 0 else '')
+        except (OSError, FileNotFoundError):
+            codec = ''
+        _AUDIO_CODEC_CACHE[ts_path] = codec
+    return _AUDIO_CODEC_CACHE[ts_path]
+
+def _audio_args(ts_files: list) -> list:
+    """
+    Return the audio portion of an ffmpeg command line: pass the stream
+    through untouched when it is already AAC, otherwise re-encode — the
+    mov muxer rejects the MP2/AC-3 tracks TS recordings often carry.
+    """
+    if all(get_audio_codec(p) == 'aac' for p in ts_files):
+        return ['-c:a', 'copy']
+    return ['-c:a', 'aac', '-b:a', '128k']
 
 def create_metadata_overlay(entries: list, duration: float, vin: str) -> str:
     """
@@ -151,11 +311,30 @@ def create_metadata_overlay(entries: list, duration: float, vin: str) -> str:
         time_per_sub = duration / count
 
     # Limit to 1000 subtitle lines by sampling every 'step' entries
-    max_subs = 1000
-    step     = max(1, count // max_subs)
-    sampled  = entries[::step]
-
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.ass', delete=False) as tmp:
+    max_subs  = 1000
+    step      = max(1, count // max_subs)
+    n_sampled = (count + step - 1) // step
+
+    # SoA extraction: pull each displayed field into its own column once and
+    # sample by slicing, instead of five dict lookups per row inside the loop
+    if DISPLAY['speed']:
+        kmh_vals = np.fromiter((e.get('velocity', 0) for e in entries),
+                               dtype=np.float32, count=count)[::step]
+        mph_vals = kmh_vals * (1.0 / 1.60934)
+    if DISPLAY['date']:
+        dates = [e.get('date', '') for e in entries][::step]
+    if DISPLAY['time']:
+        times = [e.get('time', '') for e in entries][::step]
+    if DISPLAY['coordinates']:
+        # float64 here: coordinates render at six decimals, which is past
+        # float32's ~7 significant digits
+        lats = np.fromiter((e.get('latitude', 0.0) for e in entries),
+                           dtype=np.float64, count=count)[::step]
+        lons = np.fromiter((e.get('longitude', 0.0) for e in entries),
+                           dtype=np.float64, count=count)[::step]
+
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.ass', delete=False,
+                                     dir=_TMPFS_DIR) as tmp:
         # Write ASS header
         header = [
             "[Script Info]",
@@ -169,27 +348,10 @@ def create_metadata_overlay(entries: list, duration: float, vin: str) -> str:
             "MarginL, MarginR, MarginV, Encoding",
         ]
 
-        # Speed style (larger font, margin near bottom)
-        ASS_STYLE['Fontsize'] = int(FONT_SIZE * SPEED_MULTIPLIER)
-        ASS_STYLE['MarginV']  = 30  # Vertical margin for speed text
-        speed_vals = ",".join(str(ASS_STYLE[key]) for key in (
-            'Fontname','Fontsize','PrimaryColour','SecondaryColour','OutlineColour',
-            'BackColour','Bold','Italic','Underline','StrikeOut','ScaleX','ScaleY',
-            'Spacing','Angle','BorderStyle','Outline','Shadow','Alignment','MarginL',
-            'MarginR','MarginV','Encoding'
-        ))
-        header.append(f"Style: Speed,{speed_vals}")
-
-        # Info style (normal font, margin slightly higher)
-        ASS_STYLE['Fontsize'] = FONT_SIZE
-        ASS_STYLE['MarginV']  = 60  # Vertical margin for info text
-        info_vals = ",".join(str(ASS_STYLE[key]) for key in (
-            'Fontname','Fontsize','PrimaryColour','SecondaryColour','OutlineColour',
-            'BackColour','Bold','Italic','Underline','StrikeOut','ScaleX','ScaleY',
-            'Spacing','Angle','BorderStyle','Outline','Shadow','Alignment','MarginL',
-            'MarginR','MarginV','Encoding'
-        ))
-        header.append(f"Style: Info,{info_vals}")
+        # Speed style (larger font, margin near bottom) and Info style
+        # (normal font, margin slightly higher), precomputed at import
+        header.append(SPEED_STYLE)
+        header.append(INFO_STYLE)
         header.append("")
         header.append("[Events]")
         header.append("Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text")
@@ -197,112 +359,265 @@ def create_metadata_overlay(entries: list, duration: float, vin: str) -> str:
 
         tmp.write("\n".join(header) + "\n")
 
-        # Write subtitle lines for each sampled entry
-        for idx, entry in enumerate(sampled):
-            actual_idx = idx * step
-            start_sec  = actual_idx * time_per_sub
-            end_sec    = min(duration, (actual_idx + step) * time_per_sub)
-
-            st = format_time(start_sec)
-            et = format_time(end_sec)
-
-            lines = []
-            # Speed overlay (if enabled)
-            if DISPLAY['speed']:
-                kmh = entry.get('velocity', 0)
-                mph = kmh / 1.60934
-                speed_txt = f"{mph:.1f} mph ({kmh:.1f} km/h)"
-                lines.append(("Speed", speed_txt))
-
-            # Date/time overlay
-            info_parts = []
-            if DISPLAY['date'] and DISPLAY['time']:
-                info_parts.append(f"{entry.get('date','')} @ {entry.get('time','')}")
-            elif DISPLAY['date']:
-                info_parts.append(f"Date: {entry.get('date','')}")
-            elif DISPLAY['time']:
-                info_parts.append(f"Time: {entry.get('time','')}")
-
-            # GPS coordinates overlay
-            if DISPLAY['coordinates']:
-                lat = entry.get('latitude', 0.0)
-                lon = entry.get('longitude', 0.0)
-                info_parts.append(f"GPS: {lat:.6f}, {lon:.6f}")
-
-            if info_parts:
-                info_txt = "\\N".join(info_parts)
-                lines.append(("Info", info_txt))
-
-            for style, text in lines:
-                tmp.write(f"Dialogue: 0,{st},{et},{style},,0,0,0,,{text}\\n\n")
+        # Timing columns: every sampled row spans `step` source entries
+        span       = step * time_per_sub
+        start_secs = np.arange(n_sampled, dtype=np.float64) * span
+        end_secs   = np.minimum(duration, start_secs + span)
+        sts = [format_time(sec) for sec in start_secs]
+        ets = [format_time(sec) for sec in end_secs]
+
+        # Text columns, one per enabled overlay component
+        speed_texts = None
+        if DISPLAY['speed']:
+            speed_texts = ["%.1f mph (%.1f km/h)" % pair
+                           for pair in zip(mph_vals, kmh_vals)]
+
+        info_texts = None
+        if DISPLAY['date'] and DISPLAY['time']:
+            info_texts = ["%s @ %s" % pair for pair in zip(dates, times)]
+        elif DISPLAY['date']:
+            info_texts = ["Date: %s" % d for d in dates]
+        elif DISPLAY['time']:
+            info_texts = ["Time: %s" % t for t in times]
+        if DISPLAY['coordinates']:
+            gps_texts = ["GPS: %.6f, %.6f" % pair for pair in zip(lats, lons)]
+            if info_texts is None:
+                info_texts = gps_texts
+            else:
+                info_texts = ["%s\\N%s" % pair
+                              for pair in zip(info_texts, gps_texts)]
+
+        # Apply the one Dialogue template across the zipped columns; ASS
+        # renders by timestamp, so Speed and Info events need not interleave.
+        # MP4 timed text cannot carry two concurrent cues on one track, so
+        # the soft-subtitle path merges both into a single event per window.
+        if (not BURN_SUBTITLES and speed_texts is not None
+                and info_texts is not None):
+            speed_texts = ["%s\\N%s" % pair
+                           for pair in zip(speed_texts, info_texts)]
+            info_texts = None
+        dialogue = []
+        if speed_texts is not None:
+            dialogue += [_DIALOGUE_TMPL % (st, et, "Speed", text)
+                         for st, et, text in zip(sts, ets, speed_texts)]
+        if info_texts is not None:
+            dialogue += [_DIALOGUE_TMPL % (st, et, "Info", text)
+                         for st, et, text in zip(sts, ets, info_texts)]
+
+        if dialogue:
+            tmp.write("\n".join(dialogue) + "\n")
 
         return tmp.name
 
+def _video_encoder_args(use_nvenc: bool) -> list:
+    """Return the video-encoder portion of an ffmpeg command line."""
+    if use_nvenc:
+        return [
+            '-c:v', 'h264_nvenc',    # NVIDIA hardware encoder
+            '-preset', 'p4',         # Balanced quality/speed preset
+            '-tune', 'hq',           # High-quality tuning
+            '-rc', 'vbr',            # Variable bitrate rate control
+            '-cq', '19',             # Constant-quality target
+            '-b:v', '0',             # Let CQ drive the bitrate
+        ]
+    return [
+        '-c:v', 'libx264',       # Video codec (CPU fallback)
+        '-preset', PRESET,       # Encoding preset
+        '-crf', CRF,             # Constant rate factor
+    ]
+
+def _run_ffmpeg(cmd: list) -> int:
+    """
+    Run an ffmpeg command, showing its progress, and return the exit code.
+    Reads ffmpeg's stderr in large non-blocking chunks rather than line by
+    line: progress updates arrive many times per second and per-line reads
+    cost a syscall each.
+    """
+    process = subprocess.Popen(cmd, stderr=subprocess.PIPE, bufsize=1048576)
+    stderr_fd = process.stderr.fileno()
+    os.set_blocking(stderr_fd, False)
+    while True:
+        ready, _, _ = select.select([stderr_fd], [], [], 0.5)
+        chunk = os.read(stderr_fd, 65536) if ready else b''
+        if chunk:
+            match = None
+            for match in _PROGRESS_RE.finditer(chunk):
+                pass  # keep only the most recent progress report
+            if match:
+                print(f"\rtime={match.group(1).decode()}", end="", flush=True)
+        elif process.poll() is not None:
+            break
+    process.wait()
+    print()  # newline after progress
+    return process.returncode
+
 def convert_with_overlay(ts_path: str, entries: list, vin: str, out_path: str) -> bool:
     """
     Run ffmpeg to crop (if requested), trim (if enabled), overlay subtitles,
     and produce the final .mov output.
     """
     print(f"🔨 Converting '{ts_path}' → '{out_path}' …")
+    ts_files = _resolve_ts_files(ts_path)
+    if len(ts_files) > 1:
+        print(f"🔗 Concatenating {len(ts_files)} TS segments in one ffmpeg run")
     try:
-        duration = get_video_duration(ts_path)
+        duration = sum(get_video_duration(p) for p in ts_files)
     except Exception as e:
         print(f"⚠️  Could not read duration: {e}")
         duration = 0
 
-    subtitle_file = create_metadata_overlay(entries, duration, vin)
+    # With every DISPLAY flag off — or no metadata entries to show — the
+    # overlay would be empty; skip the subtitle file and its filter work
+    overlay_on = any(DISPLAY.values()) and bool(entries)
+    subtitle_file = (create_metadata_overlay(entries, duration, vin)
+                     if overlay_on else None)
+
+    use_nvenc = _detect_nvenc()
+    if use_nvenc:
+        print("⚡ NVENC hardware encoder detected — decoding/encoding on GPU")
 
     # Build ffmpeg video filter chain: crop → subtitles
     filters = []
+    burn_overlay = BURN_SUBTITLES and overlay_on
+    needs_cpu_frames = burn_overlay or CROP_QUADRANT in (1, 2, 3, 4)
+    if use_nvenc and needs_cpu_frames:
+        # Frames arrive in CUDA memory; the ass/crop filters need
+        # system-memory frames, so download once and upload back for NVENC.
+        filters += ["hwdownload", "format=nv12"]
     if CROP_QUADRANT in (1, 2, 3, 4):
-        crops = {
-            1: "crop=in_w/2:in_h/2:0:0",
-            2: "crop=in_w/2:in_h/2:in_w/2:0",
-            3: "crop=in_w/2:in_h/2:0:in_h/2",
-            4: "crop=in_w/2:in_h/2:in_w/2:in_h/2",
-        }
-        filters.append(crops[CROP_QUADRANT])
-
-    filters.append(f"ass={subtitle_file}")
+        filters.append(QUADRANT_CROPS[CROP_QUADRANT])
+
+    if burn_overlay:
+        filters.append(f"ass={subtitle_file}")
+    if use_nvenc and needs_cpu_frames:
+        filters.append("hwupload_cuda")
     vf = ",".join(filters)
 
-    cmd = ['ffmpeg', '-i', ts_path]
+    input_args, concat_list = _build_input_args(ts_files)
+    cmd = ['ffmpeg']
+    if use_nvenc:
+        # Decode on the GPU (nvdec) and keep frames in CUDA memory
+        cmd += ['-hwaccel', 'cuda', '-hwaccel_output_format', 'cuda']
+    cmd += input_args
+
+    soft_overlay = overlay_on and not BURN_SUBTITLES
+    if soft_overlay:
+        # Pre-baked sidecar: mux the overlay as a toggleable subtitle track
+        # instead of re-rendering every frame through the ass filter
+        cmd += ['-i', subtitle_file]
 
     if ENABLE_TRIMMING:
         cmd += ['-ss', TRIM_START, '-t', TRIM_DURATION]
 
+    if filters:
+        cmd += ['-vf', vf]
+    if soft_overlay:
+        cmd += ['-map', '0:v', '-map', '0:a?', '-map', '1:0',
+                '-c:s', 'mov_text']
+
+    cmd += _video_encoder_args(use_nvenc)
+
+    cmd += _audio_args(ts_files)
     cmd += [
-        '-vf', vf,
-        '-c:v', 'libx264',       # Video codec
-        '-preset', 'veryslow',   # Encoding preset (slower but high quality)
-        '-crf', '1',             # CRF=1 → near‐lossless quality
-        '-c:a', 'aac',           # Audio codec
-        '-b:a', '128k',          # Audio bitrate
         '-movflags', '+faststart', # Optimize for streaming
         '-y', out_path
     ]
 
-    process = subprocess.Popen(cmd, stderr=subprocess.PIPE, text=True)
-    for line in process.stderr:
-        if 'time=' in line:
-            print(f"\r{line.strip()}", end="", flush=True)
-    process.wait()
-    print()  # newline after progress
+    returncode = _run_ffmpeg(cmd)
 
-    # Delete the temporary subtitle file
-    try:
-        os.remove(subtitle_file)
-    except OSError:
-        pass
+    # Delete the temporary subtitle (and concat list) files
+    for path in (subtitle_file, concat_list):
+        if path:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
 
-    if process.returncode == 0:
-        before = os.path.getsize(ts_path) / (1024 * 1024)
+    if returncode == 0:
+        before = sum(os.path.getsize(p) for p in ts_files) / (1024 * 1024)
         after  = os.path.getsize(out_path) / (1024 * 1024)
         change = (after - before) / before * 100 if before > 0 else 0
         print(f"✅ Done! Size: {before:.1f} MB → {after:.1f} MB ({change:+.1f} %)")
         return True
     else:
-        print(f"❌ FFmpeg failed (exit code {process.returncode})")
+        print(f"❌ FFmpeg failed (exit code {returncode})")
+        return False
+
+def convert_all_quadrants(ts_path: str, entries: list, vin: str) -> bool:
+    """
+    Produce one cropped .mov per quadrant in a single ffmpeg run.
+    The input is decoded (and the overlay rendered) once, then split 1:4
+    with each branch cropped and encoded to its own output, instead of
+    four full decode/overlay passes.
+    """
+    print(f"🔨 Converting '{ts_path}' → four quadrant files …")
+    ts_files = _resolve_ts_files(ts_path)
+    if len(ts_files) > 1:
+        print(f"🔗 Concatenating {len(ts_files)} TS segments in one ffmpeg run")
+    try:
+        duration = sum(get_video_duration(p) for p in ts_files)
+    except Exception as e:
+        print(f"⚠️  Could not read duration: {e}")
+        duration = 0
+
+    # As in convert_with_overlay: nothing to show means no overlay work
+    overlay_on = any(DISPLAY.values()) and bool(entries)
+    subtitle_file = (create_metadata_overlay(entries, duration, vin)
+                     if overlay_on else None)
+    burn_overlay = BURN_SUBTITLES and overlay_on
+    soft_overlay = overlay_on and not BURN_SUBTITLES
+
+    use_nvenc = _detect_nvenc()
+    if use_nvenc:
+        print("⚡ NVENC hardware encoder detected — encoding on GPU")
+
+    # One shared branch burns the overlay, then split 1:4 and crop each leg
+    shared = f"ass={subtitle_file}," if burn_overlay else ""
+    upload = ",hwupload_cuda" if use_nvenc else ""
+    graph = f"[0:v]{shared}split=4[v1][v2][v3][v4];" + ";".join(
+        f"[v{q}]{QUADRANT_CROPS[q]}{upload}[q{q}]" for q in (1, 2, 3, 4)
+    )
+
+    input_args, concat_list = _build_input_args(ts_files)
+    cmd = ['ffmpeg', '-y'] + input_args
+    if soft_overlay:
+        # Pre-baked sidecar: mux the overlay as a toggleable subtitle track
+        # into each output instead of burning it into the shared branch
+        cmd += ['-i', subtitle_file]
+    cmd += ['-filter_complex', graph]
+
+    out_paths = []
+    for q in (1, 2, 3, 4):
+        out_path = generate_output_filename(q)
+        out_paths.append(out_path)
+        if ENABLE_TRIMMING:
+            # Output-side trim binds to each output file and keeps the
+            # overlay cues, which are timed from the start of the
+            # recording, in sync — input-side -ss would rebase the video
+            # to t=0 and desynchronize them
+            cmd += ['-ss', TRIM_START, '-t', TRIM_DURATION]
+        cmd += ['-map', f'[q{q}]', '-map', '0:a?']
+        if soft_overlay:
+            cmd += ['-map', '1:0', '-c:s', 'mov_text']
+        cmd += _video_encoder_args(use_nvenc)
+        cmd += _audio_args(ts_files)
+        cmd += ['-movflags', '+faststart', out_path]
+
+    returncode = _run_ffmpeg(cmd)
+
+    for path in (subtitle_file, concat_list):
+        if path:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    if returncode == 0:
+        for out_path in out_paths:
+            print(f"✅ {out_path}: {os.path.getsize(out_path) / (1024 * 1024):.1f} MB")
+        return True
+    else:
+        print(f"❌ FFmpeg failed (exit code {returncode})")
         return False
 
 # ——— Main Entry Point ———
@@ -312,7 +627,7 @@ def main():
     if not check_dependencies():
         sys.exit(1)
 
-    if not os.path.exists(TS_FILE):
+    if not glob.glob(TS_FILE) and not os.path.exists(TS_FILE):
         print(f"❌ '{TS_FILE}' not found. Exiting.")
         sys.exit(1)
     if not os.path.exists(JSON_FILE):
@@ -329,15 +644,25 @@ def main():
     if entries:
         first, last = entries[0], entries[-1]
         print(f"   Date range: {first.get('date')} → {last.get('date')}")
-        speeds = [e.get('velocity', 0) for e in entries]
-        print(f"   Speed range: {min(speeds):.1f}–{max(speeds):.1f} km/h")
+        # Vectorized min/max over one contiguous float64 buffer instead of
+        # three pure-Python passes over the entry dicts
+        speeds = np.fromiter((e.get('velocity', 0) for e in entries),
+                             dtype=np.float64, count=len(entries))
+        print(f"   Speed range: {speeds.min():.1f}–{speeds.max():.1f} km/h")
 
     print("\n🎬 Starting conversion…")
-    success = convert_with_overlay(TS_FILE, entries, vin, OUTPUT_FILE)
-    if success:
-        print(f"\n🎉 Your file is ready: '{OUTPUT_FILE}' (playable in QuickTime).")
+    if CROP_QUADRANT == 'all':
+        success = convert_all_quadrants(TS_FILE, entries, vin)
+        if success:
+            print("\n🎉 Your quadrant files are ready (playable in QuickTime).")
+        else:
+            sys.exit(1)
     else:
-        sys.exit(1)
+        success = convert_with_overlay(TS_FILE, entries, vin, OUTPUT_FILE)
+        if success:
+            print(f"\n🎉 Your file is ready: '{OUTPUT_FILE}' (playable in QuickTime).")
+        else:
+            sys.exit(1)
 
 if __name__ == "__main__":
     main()
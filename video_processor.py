@@ -10,6 +10,17 @@ import os
 import sys
 import tempfile
 
+try:
+    import orjson  # optional: much faster JSON parsing than stdlib json
+except ImportError:
+    orjson = None
+
+def _json_loads(buf):
+    """Parse a JSON document with orjson when available."""
+    if orjson is not None:
+        return orjson.loads(buf)
+    return json.loads(buf)
+
 # ——— CONFIGURATION ———
 
 TS_FILE      = "01_Drive_Recorder_Camera_selection_All.ts"                  # Input TS file (BMW recorder video)
@@ -25,20 +36,29 @@ def load_metadata(json_file: str) -> list:
     Expects either a list-of-dicts or single dict containing 'entries'.
     Returns a list of entries.
     """
-    with open(json_file, 'r') as f:
-        data = json.load(f)
+    with open(json_file, 'rb') as f:
+        data = _json_loads(f.read())
     if isinstance(data, list) and data:
         return data[0].get('entries', [])
     return data.get('entries', [])
 
+# ffprobe durations keyed by file path, so repeated runs against the same
+# input don't spawn ffprobe and re-parse its JSON again
+_DURATION_CACHE = {}
+
 def get_video_duration(video_file: str) -> float:
-    """Get the duration of the video file in seconds using ffprobe."""
+    """Get the duration of the video file in seconds using ffprobe (cached per path)."""
+    if video_file in _DURATION_CACHE:
+        return _DURATION_CACHE[video_file]
     try:
-        cmd = ['ffprobe', '-v', 'quiet', '-print_format', 'json', '-show_format', video_file]
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        # Ask for the one field we need as a bare value instead of dumping
+        # and parsing the whole -show_format JSON document
+        cmd = ['ffprobe', '-v', 'quiet', '-show_entries', 'format=duration',
+               '-of', 'default=noprint_wrappers=1:nokey=1', video_file]
+        result = subprocess.run(cmd, capture_output=True)
         if result.returncode == 0:
-            data = json.loads(result.stdout)
-            duration = float(data['format']['duration'])
+            duration = float(result.stdout.decode().strip())
+            _DURATION_CACHE[video_file] = duration
             return duration
         else:
             return None
@@ -63,12 +83,20 @@ def install_ffmpeg_instructions():
     print("  2. Then install FFmpeg:")
     print("     brew install ffmpeg\n")
 
+# Subtitle files are small and read exactly once by ffmpeg; keep them on
+# tmpfs where the platform provides it (Linux) so they never hit the disk.
+# None falls back to the regular temp directory (e.g. on macOS).
+_TMPFS_DIR = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
 def format_time(sec: float) -> str:
     """Convert seconds → 'H:MM:SS.CS' for ASS subtitles."""
-    h = int(sec // 3600)
-    m = int((sec % 3600) // 60)
-    s = sec % 60
-    return f"{h}:{m:02d}:{s:05.2f}"
+    # Integer divmod chain on centiseconds; cheaper than float modulo plus
+    # f-string float formatting in the subtitle loop
+    cs = int(sec * 100 + 0.5)
+    s, cs = divmod(cs, 100)
+    m, s  = divmod(s, 60)
+    h, m  = divmod(m, 60)
+    return "%d:%02d:%02d.%02d" % (h, m, s, cs)
 
 def create_subtitle_file(entries: list, video_duration: float) -> str:
     """
@@ -76,7 +104,8 @@ def create_subtitle_file(entries: list, video_duration: float) -> str:
     Properly synchronizes metadata with video duration.
     Returns the path to the .ass file.
     """
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.ass', delete=False) as tmp:
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.ass', delete=False,
+                                     dir=_TMPFS_DIR) as tmp:
         tmp.write(
             "[Script Info]\n"
             "Title: BMW Overlay\n"
@@ -102,11 +131,13 @@ def create_subtitle_file(entries: list, video_duration: float) -> str:
         sample_rate = max(1, min(30, len(entries) // 100))  # At least every 30th, max 100 overlays
         sample_entries = entries[::sample_rate]
         
+        # Each sampled line spans 'sample_rate' entries; hoist the constant
+        # span out of the loop instead of recomputing the products per line
+        time_per_sample = time_per_entry * sample_rate
+
         for i, entry in enumerate(sample_entries):
-            # Calculate timing based on actual position in original array
-            actual_index = i * sample_rate
-            start_time = actual_index * time_per_entry
-            end_time = start_time + (time_per_entry * sample_rate)
+            start_time = i * time_per_sample
+            end_time = start_time + time_per_sample
             
             st = format_time(start_time)
             et = format_time(end_time)